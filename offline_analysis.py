@@ -1,4 +1,5 @@
-from typing import Optional, Tuple
+from typing import Iterator, Optional, Tuple
+from contextlib import contextmanager
 from pathlib import Path
 import numpy as np, json, yaml, os
 import cv2 as cv, rawpy
@@ -114,6 +115,147 @@ def prepare_image(
     return z, extent
 
 
+@contextmanager
+def sensor_image(file: str | Path) -> Iterator[np.ndarray]:
+    """
+    Opens the undemosaiced sensor data of a photo as a single-channel image.
+
+    Skips rawpy's postprocessing, so it is much cheaper than `prepare_image`
+    when only the spot position is needed. The orientation flip stored in the
+    file is applied, so coordinates match those of `prepare_image`. For .ARW
+    files the image is a view of rawpy's buffer, only valid inside the `with`
+    block; nothing is copied until a window is cropped from it.
+
+    Args:
+        file (str | Path): Path to the .ARW (or any image readable by OpenCV).
+
+    Yields:
+        np.ndarray: Single-channel image in `prepare_image` pixel coordinates.
+
+    Raises:
+        OSError: If the image cannot be read.
+    """
+    file = Path(file)
+
+    if file.suffix == ".ARW":
+        with rawpy.imread(str(file)) as raw_base:
+            yield orient_image(raw_base.raw_image_visible, raw_base.sizes.flip)
+        return
+
+    image = cv.imread(str(file), cv.IMREAD_GRAYSCALE)
+    if image is None:
+        raise OSError(f"Unable to read {file}.")
+
+    yield image
+
+
+def orient_image(image: np.ndarray, flip: int) -> np.ndarray:
+    """
+    Applies a LibRaw orientation flag, as `postprocess` does to its output.
+
+    Args:
+        image (np.ndarray): Image in sensor orientation.
+        flip (int): LibRaw flip flag (bit 0: mirror columns, bit 1: mirror rows, bit 2: transpose).
+
+    Returns:
+        np.ndarray: View of the oriented image.
+    """
+    if flip & 1:
+        image = image[:, ::-1]
+    if flip & 2:
+        image = image[::-1, :]
+    if flip & 4:
+        image = image.T
+
+    return image
+
+
+def crop_window(
+    frame: np.ndarray,
+    x0: float,
+    y0: float,
+    half_width: float
+) -> Tuple[np.ndarray, int, int]:
+    """
+    Crops a square window around (x0, y0), clipped to the frame boundaries.
+
+    Args:
+        frame (np.ndarray): Full sensor image.
+        x0 (float): Window centre column.
+        y0 (float): Window centre row.
+        half_width (float): Half of the window side, in pixels.
+
+    Returns:
+        Tuple[np.ndarray, int, int]: Float copy of the window and its first column and row in the frame.
+    """
+    height, width = frame.shape[:2]
+
+    row_start = max(int(y0 - half_width), 0)
+    row_end   = min(int(y0 + half_width), height)
+    col_start = max(int(x0 - half_width), 0)
+    col_end   = min(int(x0 + half_width), width)
+
+    window = np.ascontiguousarray(frame[row_start:row_end, col_start:col_end], dtype=np.float32)
+    return window, col_start, row_start
+
+
+def locate_spot(
+    z: np.ndarray,
+    blurvar: int = 10,
+    level: float = 0.5,
+    significance: float = 5.,
+    min_radius: float = 3.
+) -> Optional[Tuple[float, float, float]]:
+    """
+    Finds the spot in an image by fitting a circle to its `level` contour.
+
+    The spot is rejected if its peak does not stand `significance` times the
+    background noise (MAD) above the median, if its contour is smaller than
+    `min_radius`, or if its contour touches the image border, since it is then
+    clipped and its centre cannot be trusted.
+
+    Args:
+        z (np.ndarray): Single-channel image, usually a window of the sensor.
+        blurvar (int): Blur kernel size.
+        level (float): Contour level, as a fraction of the background-subtracted maximum.
+        significance (float): Minimum peak height, in units of the background noise.
+        min_radius (float): Minimum equivalent radius of the contour, in pixels.
+
+    Returns:
+        Optional[Tuple[float, float, float]]: (x0, y0, R) in image coordinates, or None if not found.
+    """
+    if z.shape[0] <= blurvar or z.shape[1] <= blurvar:
+        return None
+
+    blur = cv.blur(np.ascontiguousarray(z, dtype=np.float32), (blurvar, blurvar))
+    blur = blur - np.median(blur)
+    noise = 1.4826 * np.median(np.abs(blur))
+    if blur.max() <= 0 or blur.max() <= significance * noise:
+        return None
+
+    mask = (blur >= level * blur.max()).astype(np.uint8)
+    contours, _ = cv.findContours(mask, cv.RETR_EXTERNAL, cv.CHAIN_APPROX_NONE)
+    if not contours:
+        return None
+
+    contour = max(contours, key=cv.contourArea)[:, 0, :]
+    x = contour[:, 0].astype(float)
+    y = contour[:, 1].astype(float)
+
+    height, width = z.shape[:2]
+    if x.min() <= 0 or y.min() <= 0 or x.max() >= width - 1 or y.max() >= height - 1:
+        return None
+
+    radius = np.sqrt(cv.contourArea(contour) / np.pi)
+    if len(x) < 3 or radius < min_radius:
+        return None
+
+    guess = [x.mean(), y.mean(), radius]
+    fit = least_squares(circle_residuals, guess, args=(x, y))
+
+    return tuple(fit.x)
+
+
 def spot_display(
     z: np.ndarray,
     extent: Tuple[int, int, int, int],
@@ -198,6 +340,129 @@ def load_json(json_path: str | Path) -> dict:
         return json.load(json_input)
 
 
+def search_spot(
+    frame: np.ndarray,
+    guess: Optional[Tuple[float, float, float]],
+    margin: float = 2.,
+    grow: float = 2.,
+    attempts: int = 3,
+    blurvar: int = 10,
+    level: float = 0.5,
+    significance: float = 5.
+) -> Optional[Tuple[float, float, float]]:
+    """
+    Searches for the spot in growing windows around a guess, then in the full frame.
+
+    Args:
+        frame (np.ndarray): Full sensor image, as given by `sensor_image`.
+        guess (Optional[Tuple[float, float, float]]): Predicted (x0, y0, R), or None.
+        margin (float): Initial window half-width, in spot radii.
+        grow (float): Window growth factor after each miss.
+        attempts (int): Number of windows tried before searching the full frame.
+        blurvar (int): Blur kernel size.
+        level (float): Contour level used by `locate_spot`.
+        significance (float): Minimum peak height used by `locate_spot`, in noise units.
+
+    Returns:
+        Optional[Tuple[float, float, float]]: (x0, y0, R) in frame coordinates, or None if not found.
+    """
+    if guess is not None:
+        x0, y0, R = guess
+        half_width = margin * R
+        for _ in range(attempts):
+            window, col_start, row_start = crop_window(frame, x0, y0, half_width)
+            found = locate_spot(window, blurvar=blurvar, level=level, significance=significance)
+            if found is not None:
+                return (found[0] + col_start, found[1] + row_start, found[2])
+            if window.shape == frame.shape:
+                return None
+            half_width *= grow
+
+    return locate_spot(frame, blurvar=blurvar, level=level, significance=significance)
+
+
+def track_run(
+    db: Database,
+    run_number: str | int,
+    led_serial: Optional[str | int] = None,
+    margin: float = 2.,
+    grow: float = 2.,
+    attempts: int = 3,
+    blurvar: int = 10,
+    level: float = 0.5,
+    significance: float = 5.,
+    write: bool = True
+) -> list[dict]:
+    """
+    Locates the spot in every photo of a run, walking the run in capture order.
+
+    The search window of each photo is predicted from the last spot found at the
+    same channel and distance, then from the photo's stored spot, then from the
+    previous photo of the run. The window is `margin` radii wide and grows by
+    `grow` each time the spot is not found inside it; the full frame is only
+    searched when all `attempts` fail or there is nothing to predict from.
+
+    Only the centres are written back. The fitted radius is the `level` contour
+    radius, not the stored 'best_R', so it is kept in 'tracked_R' and only used
+    to size the next windows. Photos that cannot be read, or where no spot is
+    found, keep their stored centres and get 'tracked_R' set to None.
+
+    Args:
+        db (Database): Database holding the run.
+        run_number (str | int): Run to track.
+        led_serial (str | int | None): Filter by LED serial number.
+        margin (float): Initial window half-width, in spot radii.
+        grow (float): Window growth factor after each miss.
+        attempts (int): Number of windows tried before searching the full frame.
+        blurvar (int): Blur kernel size.
+        level (float): Contour level used by `locate_spot`.
+        significance (float): Minimum peak height used by `locate_spot`, in noise units.
+        write (bool): Write the refined centres back to the 'photos' table.
+
+    Returns:
+        list[dict]: All of the run's photos, with 'best_x0' and 'best_y0' refined and
+        'tracked_R' added (None if the photo was not tracked).
+    """
+    photos = db.fetch_run_photos(run_number, led_serial=led_serial)
+
+    last_spot: dict[tuple, Tuple[float, float, float]] = {}
+    previous: Optional[Tuple[float, float, float]] = None
+
+    for photo in photos:
+        key = (photo['channel'], photo['distance'])
+
+        stored = None
+        if photo['best_R']:
+            stored = (photo['best_x0'], photo['best_y0'], photo['best_R'])
+
+        guess = last_spot.get(key) or stored or previous
+
+        photo['tracked_R'] = None
+
+        try:
+            with sensor_image(photo['photo_path'][0]) as frame:
+                spot = search_spot(
+                    frame, guess, margin=margin, grow=grow, attempts=attempts,
+                    blurvar=blurvar, level=level, significance=significance
+                )
+        except (OSError, rawpy.LibRawError) as e:
+            print(f"Unable to read {photo['photo_path'][0]}: {e}")
+            continue
+
+        if spot is None:
+            print(f"Unable to locate spot in {photo['photo_path'][0]}.")
+            continue
+
+        last_spot[key] = spot
+        previous = spot
+        photo['best_x0'], photo['best_y0'], photo['tracked_R'] = spot
+
+        if write:
+            db.update_spot(photo['photo_key'], spot[0], spot[1])
+
+    return photos
+
+
 def offline_analysis() -> None:
     """
     Loads photos from a database and performs offline visualization.
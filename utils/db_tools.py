@@ -10,10 +10,12 @@ class Database:
 
     path: str
     allowed_tables: list[str] = field(default_factory=lambda: ['photos', 'runs'])
+    key_column: str = field(default='', init=False)
 
     def __post_init__(self) -> None:
         """Initializes the database structure upon object creation."""
         self.setup_database()
+        self.photo_key_column()
 
     def cursor(
         self,
@@ -285,3 +287,99 @@ class Database:
                 print(f"Unable to parse row {row}: {e}")
 
         return photo_jsons
+
+    def photo_key_column(self) -> str:
+        """
+        Returns the primary key column of the 'photos' table.
+
+        Databases created by older versions store the photo as a JSON 'photo_path'
+        list, while `setup_database` now creates 'photo_directory' and 'photo_arw'.
+        The result is cached in `key_column`.
+
+        Returns:
+            str: 'photo_path' or 'photo_arw'.
+        """
+        if not self.key_column:
+            columns = self.cursor('PRAGMA table_info(photos)', fetch='all') or []
+            names = [column[1] for column in columns]
+            self.key_column = 'photo_path' if 'photo_path' in names else 'photo_arw'
+
+        return self.key_column
+
+    def fetch_run_photos(
+        self,
+        run_number: str | int,
+        led_serial: Optional[str | int] = None
+    ) -> list[dict[str, Any]]:
+        """
+        Retrieves the photos of a run in capture order.
+
+        Args:
+            run_number (str | int): Run to retrieve.
+            led_serial (str | int | None): Filter by LED serial number.
+
+        Returns:
+            list[dict[str, Any]]: One dictionary per photo, sorted by 'date', with its
+            'photo_path' list, 'photo_key' (primary key, for `update_spot`), channel,
+            distance and stored spot parameters.
+        """
+        key_column = self.photo_key_column()
+        if key_column == 'photo_path':
+            path_columns = 'photo_path, photo_path'
+        else:
+            path_columns = 'photo_arw, photo_directory'
+
+        query = f'''
+            SELECT {path_columns}, date, channel, distance,
+                   best_x0, best_y0, best_R
+            FROM photos WHERE run_number = ?
+        '''
+        params: list[Any] = [run_number]
+
+        if led_serial is not None:
+            query += ' AND led_serial = ?'
+            params.append(led_serial)
+
+        query += ' ORDER BY date'
+
+        results = self.cursor(query, params=params, fetch='all') or []
+
+        photos: list[dict[str, Any]] = []
+        for row in results:
+            key, location, date, channel, distance, x0, y0, R = row
+            try:
+                if key_column == 'photo_path':
+                    photo_path = json.loads(location)
+                else:
+                    photo_path = [str(Path(location) / key)]
+            except Exception as e:
+                print(f"Unable to parse row {row}: {e}")
+                continue
+
+            photos.append({
+                'photo_key': key,
+                'photo_path': photo_path,
+                'date': date,
+                'channel': channel,
+                'distance': distance,
+                'best_x0': x0,
+                'best_y0': y0,
+                'best_R': R
+            })
+
+        return photos
+
+    def update_spot(self, photo_key: str, x0: float, y0: float) -> list[tuple] | None:
+        """
+        Overwrites the spot centre stored for a photo. 'best_R' is left untouched.
+
+        Args:
+            photo_key (str): Primary key of the photo, as returned by `fetch_run_photos`.
+            x0 (float): Spot centre column, in pixels.
+            y0 (float): Spot centre row, in pixels.
+
+        Returns:
+            list[tuple] | None: Result of the update operation.
+        """
+        statement = f'UPDATE photos SET best_x0 = ?, best_y0 = ? WHERE {self.photo_key_column()} = ?'
+        return self.cursor(statement, params=[float(x0), float(y0), photo_key])